@@ -1,7 +1,9 @@
 import sys
+import os
+import json
 import argparse
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 # Configuration constants
 USER_PREFERENCES = {
@@ -13,57 +15,160 @@ AVAILABLE_INTERFACES = {
     "gui": "Graphical Interface (Tkinter) - User-friendly with buttons and RTL support",
 }
 
-# Check for optional dependencies and import them conditionally
-try:
-    from textual.app import App, ComposeResult
-    from textual.widgets import Static, TextArea
-    from textual.containers import Container, Vertical
-    from textual.screen import ModalScreen
-    from textual.binding import Binding
-    from textual import events
-    TEXTUAL_AVAILABLE = True
-except ImportError:
-    TEXTUAL_AVAILABLE = False
-
-try:
-    import tkinter as tk
-    from tkinter import ttk, messagebox, scrolledtext
-    import pyperclip
-    TKINTER_AVAILABLE = True
-except ImportError:
-    TKINTER_AVAILABLE = False
-    pyperclip = None
+# Derived once for argparse choices, help text and error messages
+_INTERFACE_KEYS = list(AVAILABLE_INTERFACES.keys())
+_INTERFACE_EPILOG = "\n".join(f"  {key}: {desc}" for key, desc in AVAILABLE_INTERFACES.items())
+
+# Persisted preferences live in a sidecar file so the script never rewrites itself
+PREFERENCES_FILE_PATH = os.path.join(os.path.expanduser("~"), ".prompt_collector_prefs.json")
+
+
+def _load_user_preferences():
+    """Merge valid preferences from PREFERENCES_FILE_PATH into USER_PREFERENCES."""
+    try:
+        with open(PREFERENCES_FILE_PATH, "r", encoding="utf-8") as file:
+            stored_preferences = json.load(file)
+    except (OSError, ValueError):
+        return
+
+    if not isinstance(stored_preferences, dict):
+        return
+    default_interface = stored_preferences.get("default_interface")
+    if isinstance(default_interface, str) and default_interface in AVAILABLE_INTERFACES:
+        USER_PREFERENCES["default_interface"] = default_interface
+
+
+_load_user_preferences()
+
+# Precompiled patterns used on hot paths
+_ARABIC_CHAR_RE = re.compile(r"[\u0600-\u06FF\u0750-\u077F]")
+# A word is either an Arabic run or a run of other non-whitespace characters
+_WORD_TOKEN_RE = re.compile(r"[\u0600-\u06FF\u0750-\u077F]+|[^\s\u0600-\u06FF\u0750-\u077F]+")
+
+# Delay before recomputing statistics after a burst of keystrokes
+_TEXT_CHANGE_DEBOUNCE_MS = 100
+
+# Language detection sampling for long texts
+_SAMPLING_THRESHOLD = 4096
+_SAMPLE_SIZE = 2048
+_MIN_SAMPLE_MEANINGFUL = 256
+_SCAN_CHUNK_SIZE = 4096
+
+# Optional dependencies are imported on first use so CLI-only paths start fast.
+# Availability flags stay None until the corresponding import has been attempted.
+TEXTUAL_AVAILABLE = None
+TKINTER_AVAILABLE = None
+pyperclip = None
+tk = ttk = messagebox = scrolledtext = None
+
+
+def _try_import_pyperclip() -> bool:
+    """Import pyperclip on demand and report whether it is available."""
+    global pyperclip
+    if pyperclip is None:
+        try:
+            import pyperclip
+        except ImportError:
+            pyperclip = None
+    return pyperclip is not None
+
+
+def _try_import_textual() -> bool:
+    """Import Textual and define its interface classes on first call."""
+    global App, ComposeResult, Static, TextArea, Container, Vertical
+    global ModalScreen, Binding, events, TEXTUAL_AVAILABLE
+    if TEXTUAL_AVAILABLE is None:
+        try:
+            from textual.app import App, ComposeResult
+            from textual.widgets import Static, TextArea
+            from textual.containers import Container, Vertical
+            from textual.screen import ModalScreen
+            from textual.binding import Binding
+            from textual import events
+            TEXTUAL_AVAILABLE = True
+        except ImportError:
+            TEXTUAL_AVAILABLE = False
+        else:
+            _try_import_pyperclip()
+            _define_textual_interface_classes()
+    return TEXTUAL_AVAILABLE
+
+
+def _try_import_tkinter() -> bool:
+    """Import Tkinter and pyperclip on first call."""
+    global tk, ttk, messagebox, scrolledtext, TKINTER_AVAILABLE
+    if TKINTER_AVAILABLE is None:
+        try:
+            import tkinter as tk
+            from tkinter import ttk, messagebox, scrolledtext
+            TKINTER_AVAILABLE = _try_import_pyperclip()
+        except ImportError:
+            TKINTER_AVAILABLE = False
+    return TKINTER_AVAILABLE
 
 
 class TextAnalysisHelper:
     """Enhanced Arabic text processing and Right-to-Left language detection."""
 
+    @staticmethod
+    def _count_arabic_and_meaningful(text: str) -> Tuple[int, int]:
+        """Return (arabic_character_count, total_meaningful_characters) for text."""
+        # Both counts are C-level scans instead of a per-character loop;
+        # str.split() drops exactly the characters str.isspace() accepts
+        total_meaningful_characters = sum(map(len, text.split()))
+        arabic_character_count = len(_ARABIC_CHAR_RE.findall(text))
+        return arabic_character_count, total_meaningful_characters
+
     @staticmethod
     def contains_arabic_characters(text: str) -> bool:
         """
         Determine if text contains Arabic characters.
         
+        Long texts are first judged on a strided sample; the full text is only
+        scanned when the sample is too small or its ratio is close to the threshold.
+        The full scan runs chunk by chunk and stops as soon as the unscanned
+        remainder can no longer change the outcome.
+        
         Args:
             text: Input text to analyze
             
         Returns:
             True if text has significant Arabic content (>30%), False otherwise
         """
-        if not text.strip():
+        if text.isascii():
             return False
 
+        if len(text) > _SAMPLING_THRESHOLD:
+            sample = text[::max(1, len(text) // _SAMPLE_SIZE)]
+            arabic_count, meaningful_count = TextAnalysisHelper._count_arabic_and_meaningful(sample)
+            if meaningful_count >= _MIN_SAMPLE_MEANINGFUL:
+                sample_ratio = arabic_count / meaningful_count
+                if not 0.2 <= sample_ratio <= 0.4:
+                    return sample_ratio > 0.3
+
         arabic_character_count = 0
         total_meaningful_characters = 0
-
-        for character in text:
-            if character.strip() and not character.isspace():
-                total_meaningful_characters += 1
-                # Check if character is in Arabic Unicode ranges
-                if "\u0600" <= character <= "\u06ff" or "\u0750" <= character <= "\u077f":
-                    arabic_character_count += 1
-
-        return (total_meaningful_characters > 0 and 
-                (arabic_character_count / total_meaningful_characters) > 0.3)
+        text_length = len(text)
+        for chunk_start in range(0, text_length, _SCAN_CHUNK_SIZE):
+            chunk_end = chunk_start + _SCAN_CHUNK_SIZE
+            chunk_arabic, chunk_meaningful = TextAnalysisHelper._count_arabic_and_meaningful(
+                text[chunk_start:chunk_end]
+            )
+            arabic_character_count += chunk_arabic
+            total_meaningful_characters += chunk_meaningful
+
+            # Ratios are compared in integers (ratio > 0.3 <=> 10 * arabic > 3 * meaningful).
+            # Above 30% even if every remaining character is meaningful non-Arabic
+            remaining_characters = max(0, text_length - chunk_end)
+            if 10 * arabic_character_count > 3 * (total_meaningful_characters + remaining_characters):
+                return True
+            # At most 30% even if every remaining character is Arabic
+            if 10 * (arabic_character_count + remaining_characters) <= 3 * (
+                total_meaningful_characters + remaining_characters
+            ):
+                return False
+
+        return False
 
     @staticmethod
     def count_words_in_text(text: str) -> int:
@@ -76,18 +181,55 @@ class TextAnalysisHelper:
         Returns:
             Total word count
         """
-        if not TextAnalysisHelper.contains_arabic_characters(text):
+        # Pure ASCII cannot contain Arabic, so skip language detection entirely
+        if text.isascii() or not TextAnalysisHelper.contains_arabic_characters(text):
             return len(text.split())
 
-        # Arabic word pattern - sequences of Arabic characters
-        arabic_word_pattern = r"[\u0600-\u06FF\u0750-\u077F]+"
-        arabic_words = re.findall(arabic_word_pattern, text)
+        # Arabic runs and non-Arabic runs are tokenized in a single pass
+        return len(_WORD_TOKEN_RE.findall(text))
 
-        # Extract and count non-Arabic words
-        text_without_arabic = re.sub(arabic_word_pattern, " ", text)
-        non_arabic_words = [word for word in text_without_arabic.split() if word.strip()]
+    @staticmethod
+    def count_lines_in_text(text: str) -> int:
+        """
+        Count lines the way str.splitlines() would for editor content.
+        
+        Handles "\n", "\r\n" and "\r" line endings without building a list of lines.
+        
+        Args:
+            text: Input text to count lines in
+            
+        Returns:
+            Total line count (0 for empty text)
+        """
+        if not text:
+            return 0
+        line_breaks = text.count("\n")
+        carriage_returns = text.count("\r")
+        if carriage_returns:
+            line_breaks += carriage_returns - text.count("\r\n")
+        return line_breaks + (0 if text[-1] in "\r\n" else 1)
 
-        return len(arabic_words) + len(non_arabic_words)
+    @staticmethod
+    def _analyze_text(text: str) -> Tuple[bool, int, int, int]:
+        """Return (is_arabic, word_count, char_count, line_count) from a single tokenizing pass."""
+        line_count = TextAnalysisHelper.count_lines_in_text(text)
+        if text.isascii():
+            return False, len(text.split()), len(text), line_count
+
+        # Every non-whitespace character falls in exactly one token, and each token
+        # is either entirely Arabic or entirely non-Arabic
+        tokens = _WORD_TOKEN_RE.findall(text)
+        total_meaningful_characters = sum(map(len, tokens))
+        arabic_character_count = sum(len(token) for token in tokens if _ARABIC_CHAR_RE.match(token))
+        # Arabic ratio > 0.3, compared in integers
+        is_arabic_text = 10 * arabic_character_count > 3 * total_meaningful_characters
+
+        if is_arabic_text:
+            word_count = len(tokens)
+        else:
+            # Non-Arabic text counts whitespace-separated words, so mixed runs stay one word
+            word_count = len(text.split())
+        return is_arabic_text, word_count, len(text), line_count
 
     @staticmethod
     def get_comprehensive_text_statistics(text: str) -> Dict[str, Any]:
@@ -100,10 +242,9 @@ class TextAnalysisHelper:
         Returns:
             Dictionary with text statistics and language information
         """
-        is_arabic_text = TextAnalysisHelper.contains_arabic_characters(text)
-        word_count = TextAnalysisHelper.count_words_in_text(text)
-        character_count = len(text)
-        line_count = len(text.splitlines())
+        is_arabic_text, word_count, character_count, line_count = (
+            TextAnalysisHelper._analyze_text(text)
+        )
 
         return {
             "is_arabic": is_arabic_text,
@@ -115,7 +256,9 @@ class TextAnalysisHelper:
 
 
 # Textual Terminal Interface Classes
-if TEXTUAL_AVAILABLE:
+def _define_textual_interface_classes():
+    """Define the Textual classes; only called once Textual has been imported."""
+    global InteractiveInputModal, MainApp
 
     class InteractiveInputModal(ModalScreen):
         """Fullscreen interactive modal with multiline text input - keyboard only"""
@@ -160,17 +303,20 @@ if TEXTUAL_AVAILABLE:
         }
         """
 
+        # Status bar texts, precomputed once instead of rebuilt on every keystroke
+        _START_TYPING_MESSAGE = "START TYPING - Ctrl+S=SEND | Esc=CANCEL | Ctrl+C=Copy | Ctrl+V=Paste"
+        _STATUS_TEMPLATE = "Lines: %d | Characters: %d | Ctrl+S=Send | Esc=Cancel"
+        _STATUS_TEMPLATE_MSG = "%s | Lines: %d | Chars: %d"
+
         def __init__(self):
             super().__init__()
             self.result_text = ""
+            self._status_timer = None
 
         def compose(self) -> ComposeResult:
             yield Static("FULLSCREEN TEXT EDITOR", id="modal_title")
             yield TextArea(text="", id="input_area")
-            yield Static(
-                "START TYPING - Ctrl+S=SEND | Esc=CANCEL | Ctrl+C=Copy | Ctrl+V=Paste",
-                id="status_bar",
-            )
+            yield Static(self._START_TYPING_MESSAGE, id="status_bar")
 
         def on_mount(self):
             """Focus the text area when modal opens"""
@@ -236,17 +382,23 @@ if TEXTUAL_AVAILABLE:
 
         def update_status(self, message: str = ""):
             """Update the status bar"""
+            if message and self._status_timer is not None:
+                # Keep the pending debounced refresh from overwriting this message
+                self._status_timer.stop()
+                self._status_timer = None
             try:
                 textarea = self.query_one("#input_area", TextArea)
-                lines = len(textarea.text.split("\n"))
-                chars = len(textarea.text)
+                # Read counts from the document's line list instead of joining it into text
+                document = textarea.document
+                lines = document.line_count
+                chars = sum(map(len, document.lines)) + (lines - 1) * len(document.newline)
                 if message:
-                    status_text = f"{message} | Lines: {lines} | Chars: {chars}"
+                    status_text = self._STATUS_TEMPLATE_MSG % (message, lines, chars)
                 elif chars == 0:
                     # Show initial message when no text
-                    status_text = "START TYPING - Ctrl+S=SEND | Esc=CANCEL | Ctrl+C=Copy | Ctrl+V=Paste"
+                    status_text = self._START_TYPING_MESSAGE
                 else:
-                    status_text = f"Lines: {lines} | Characters: {chars} | Ctrl+S=Send | Esc=Cancel"
+                    status_text = self._STATUS_TEMPLATE % (lines, chars)
                 status_bar = self.query_one("#status_bar", Static)
                 status_bar.update(status_text)
             except Exception:
@@ -258,8 +410,12 @@ if TEXTUAL_AVAILABLE:
                     pass
 
         def on_text_area_changed(self, event: TextArea.Changed):
-            """Update status when text changes"""
-            self.update_status()
+            """Update status once typing pauses instead of on every keystroke"""
+            if self._status_timer is not None:
+                self._status_timer.stop()
+            self._status_timer = self.set_timer(
+                _TEXT_CHANGE_DEBOUNCE_MS / 1000, self.update_status
+            )
 
     class MainApp(App):
         """Direct fullscreen text editor - opens immediately"""
@@ -315,6 +471,11 @@ class EnhancedTkinterInterface:
     def __init__(self):
         self.user_input_result = None
         self.root_window = None
+        self._pending_recalc_id = None
+        self._last_text = None
+        self._last_stats = None
+        self._last_is_arabic = None
+        self._current_text = ""
 
     def create_user_interface(self):
         """Create and configure the tkinter interface with improved layout."""
@@ -425,10 +586,36 @@ class EnhancedTkinterInterface:
         except Exception as e:
             print(f"Text direction toggle error: {e}")
 
+    def get_current_text(self) -> str:
+        """Return the widget content, fetching it only if it changed since the last call."""
+        # Tk sets the modified flag synchronously on every insert/delete, so polling it
+        # is exact even when the queued <<Modified>> event has not been delivered yet
+        if self.text_input_area.edit_modified():
+            self._current_text = self.text_input_area.get("1.0", tk.END).rstrip("\n")
+            self.text_input_area.edit_modified(False)
+        return self._current_text
+
     def handle_text_change_event(self, event=None):
-        """Handle text change events and auto-apply RTL for Arabic text."""
-        current_text = self.text_input_area.get("1.0", tk.END).rstrip("\n")
-        text_statistics = TextAnalysisHelper.get_comprehensive_text_statistics(current_text)
+        """Schedule a statistics refresh, coalescing bursts of text change events."""
+        if self._pending_recalc_id is not None:
+            self.root_window.after_cancel(self._pending_recalc_id)
+        self._pending_recalc_id = self.root_window.after(
+            _TEXT_CHANGE_DEBOUNCE_MS, self.refresh_text_statistics
+        )
+
+    def refresh_text_statistics(self):
+        """Recompute text statistics and auto-apply RTL for Arabic text."""
+        self._pending_recalc_id = None
+        current_text = self.get_current_text()
+
+        # Reuse the previous statistics for unchanged text; the comparison returns early
+        # on identity (get_current_text hands back its cached string) or differing lengths
+        if current_text == self._last_text:
+            text_statistics = self._last_stats
+        else:
+            text_statistics = TextAnalysisHelper.get_comprehensive_text_statistics(current_text)
+            self._last_text = current_text
+            self._last_stats = text_statistics
 
         status_message = f"Lines: {text_statistics['line_count']} | Characters: {text_statistics['char_count']}"
         if text_statistics["word_count"] > 0:
@@ -440,22 +627,39 @@ class EnhancedTkinterInterface:
                 self.rtl_mode_enabled.set(True)
                 self.toggle_text_direction()
 
-        # Apply appropriate text formatting
+        # Apply appropriate text formatting, re-tagging only when the language changes
+        # or when text inserted at the very start (which Tk leaves untagged) lacks the tag
         if text_statistics["is_arabic"] and self.rtl_mode_enabled.get():
-            self.text_input_area.tag_add("rtl_text", "1.0", tk.END)
+            wanted_tag = "rtl_text"
         elif not text_statistics["is_arabic"]:
-            self.text_input_area.tag_add("ltr_text", "1.0", tk.END)
+            wanted_tag = "ltr_text"
+        else:
+            wanted_tag = None
+        if wanted_tag and (
+            text_statistics["is_arabic"] != self._last_is_arabic
+            or wanted_tag not in self.text_input_area.tag_names("1.0")
+        ):
+            self.text_input_area.tag_add(wanted_tag, "1.0", tk.END)
+        self._last_is_arabic = text_statistics["is_arabic"]
 
         self.status_display_label.config(text=status_message)
 
     def copy_text_to_clipboard(self):
         """Copy all text content to system clipboard."""
         try:
-            text_content = self.text_input_area.get("1.0", tk.END).rstrip("\n")
+            text_content = self.get_current_text()
             if pyperclip and text_content:
                 pyperclip.copy(text_content)
-                self.status_display_label.config(text="Text copied to clipboard!")
-                self.root_window.after(2000, lambda: self.handle_text_change_event())
+                previous_status = self.status_display_label.cget("text")
+                copied_status = "Text copied to clipboard!"
+                self.status_display_label.config(text=copied_status)
+
+                def restore_previous_status():
+                    # Skip if a statistics refresh already replaced the message
+                    if self.status_display_label.cget("text") == copied_status:
+                        self.status_display_label.config(text=previous_status)
+
+                self.root_window.after(2000, restore_previous_status)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to copy text: {e}")
 
@@ -493,7 +697,7 @@ class EnhancedTkinterInterface:
 
     def submit_input(self):
         """Submit the entered text and close interface."""
-        text_content = self.text_input_area.get("1.0", tk.END).rstrip("\n")
+        text_content = self.get_current_text()
         if text_content.strip():
             self.user_input_result = text_content.strip()
         self.root_window.quit()
@@ -523,6 +727,7 @@ class UserInterfaceManager:
     def __init__(self):
         self.current_user_input = None
         self.selected_interface_type = USER_PREFERENCES["default_interface"]
+        self._available_interfaces = None
 
     def update_default_interface_preference(self, interface_type: str):
         """
@@ -536,28 +741,18 @@ class UserInterfaceManager:
             USER_PREFERENCES["default_interface"] = interface_type
             self.selected_interface_type = interface_type
 
-            # Attempt to persist the preference to the file
+            # Attempt to persist the preference to the sidecar file
             try:
-                # Read current file content
-                with open(__file__, "r", encoding="utf-8") as file:
-                    file_content = file.read()
-
-                # Update the default_interface configuration line
-                pattern = r'(\s*"default_interface":\s*")[^"]*(".*)'
-                replacement = f"\\g<1>{interface_type}\\g<2>"
-                updated_content = re.sub(pattern, replacement, file_content)
-
-                # Write updated content back to file
-                with open(__file__, "w", encoding="utf-8") as file:
-                    file.write(updated_content)
+                with open(PREFERENCES_FILE_PATH, "w", encoding="utf-8") as file:
+                    json.dump(USER_PREFERENCES, file, indent=2)
 
                 print(f"✅ Default interface permanently set to: {AVAILABLE_INTERFACES[interface_type]}")
-                print(f"📝 Configuration saved to {__file__}")
+                print(f"📝 Configuration saved to {PREFERENCES_FILE_PATH}")
             except Exception as persistence_error:
                 print(f"⚠️ Settings updated for this session only. Failed to persist: {persistence_error}")
                 print(f"✅ Default interface set to: {AVAILABLE_INTERFACES[interface_type]} (session only)")
         else:
-            print(f"❌ Invalid interface type. Available options: {list(AVAILABLE_INTERFACES.keys())}")
+            print(f"❌ Invalid interface type. Available options: {_INTERFACE_KEYS}")
 
     def display_available_interface_options(self):
         """Display all available interface options with current selection highlighted."""
@@ -571,23 +766,28 @@ class UserInterfaceManager:
 
     def get_available_interface_types(self):
         """
-        Get list of currently available interface types based on installed dependencies.
+        Get currently available interface types based on installed dependencies.
+        
+        Probed on first call only, so paths that never launch an interface skip the imports.
         
         Returns:
-            List of available interface type strings
+            Tuple of available interface type strings
         """
-        available_interfaces = []
-
-        if TEXTUAL_AVAILABLE:
-            available_interfaces.append("terminal")
-        if TKINTER_AVAILABLE:
-            available_interfaces.append("gui")
+        if self._available_interfaces is None:
+            self._available_interfaces = tuple(
+                interface_type
+                for interface_type, probe_dependencies in (
+                    ("terminal", _try_import_textual),
+                    ("gui", _try_import_tkinter),
+                )
+                if probe_dependencies()
+            )
 
-        return available_interfaces
+        return self._available_interfaces
 
     def launch_terminal_interface(self):
         """Launch the Textual-based terminal interface."""
-        if not TEXTUAL_AVAILABLE:
+        if not _try_import_textual():
             print("❌ Textual library not available. Install with: pip install textual")
             return None
 
@@ -603,7 +803,7 @@ class UserInterfaceManager:
 
     def launch_gui_interface(self):
         """Launch the Tkinter-based GUI interface."""
-        if not TKINTER_AVAILABLE:
+        if not _try_import_tkinter():
             print("❌ Tkinter not available. GUI interface cannot be launched.")
             return None
 
@@ -648,7 +848,7 @@ def run_enhanced_user_input_application():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=f"""
 Available Interface Types:
-{chr(10).join(f"  {key}: {desc}" for key, desc in AVAILABLE_INTERFACES.items())}
+{_INTERFACE_EPILOG}
 
 Current Default Interface: {USER_PREFERENCES['default_interface']}
 
@@ -662,13 +862,13 @@ Usage Examples:
 
     argument_parser.add_argument(
         "--interface",
-        choices=list(AVAILABLE_INTERFACES.keys()),
+        choices=_INTERFACE_KEYS,
         help="Override default interface for this session only",
     )
 
     argument_parser.add_argument(
         "--set-default",
-        choices=list(AVAILABLE_INTERFACES.keys()),
+        choices=_INTERFACE_KEYS,
         help="Set and persist default interface preference",
     )
 